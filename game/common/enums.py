@@ -1,4 +1,4 @@
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
 """
 **NOTE:** The use of the enum structure is to make is easier to execute certain tasks. It also helps with
@@ -8,7 +8,7 @@ When developing the game, add any extra enums as necessary.
 """
 
 
-class DebugLevel(Enum):
+class DebugLevel(IntEnum):
     NONE = auto()
     CLIENT = auto()
     CONTROLLER = auto()
@@ -22,6 +22,8 @@ MAX_CLIENTS_START = None                            # maximum number of clients
 SET_NUMBER_OF_CLIENTS_START = 2                     # required number of clients to start running the game; should be None when MIN_CLIENTS or MAX_CLIENTS are used
 CLIENT_KEYWORD = "client"                           # string required to be in the name of every client file, not found otherwise
 CLIENT_DIRECTORY = "./"                             # location where client code will be found
+CLIENT_CPU_BOUND = False                            # run each client in its own process instead of a thread, for clients whose turns are CPU heavy
+MAX_SECONDS_CLIENT_STARTUP = 5.0                    # max number of seconds a client's process has to start when CLIENT_CPU_BOUND is used
 
 MIN_CLIENTS_CONTINUE = None                         # minimum number of clients required to continue running the game; should be None when SET_NUMBER_OF_CLIENTS is used
 MAX_CLIENTS_CONTINUE = None                         # maximum number of clients required to continue running the game; should be None when SET_NUMBER_OF_CLIENTS is used
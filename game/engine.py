@@ -1,28 +1,80 @@
+import functools
 import importlib
+import inspect
 import json
 import logging
 import sys
-import threading
 import traceback
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from tqdm import tqdm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from game.common.map.game_board import GameBoard
 from game.common.player import Player
 from game.config import *
 from game.controllers.master_controller import MasterController
 from game.utils.helpers import write_json_file
-from game.utils.thread import Thread, CommunicationThread
+from game.utils.process import ClientProcess
+from game.utils.thread import CommunicationThread
 from game.utils.validation import verify_code, verify_num_clients
 from game.client.user_client import UserClient
 
+_logger = logging.getLogger('engine')
+
+# CLIENT_KEYWORD never changes, so it only needs to be case folded once
+_KEYWORD_CF = CLIENT_KEYWORD.casefold()
+
+
+# Client code only needs to be verified again if the file has changed since the last check. The path has to be absolute
+# and the stamp has to identify the file itself (modification time, size, device and inode), otherwise a different file
+# with the same name and modification time could skip verification. The imports are returned as a tuple so the cached
+# result can't be changed by a caller
+@functools.lru_cache(maxsize=None)
+def _verify_cached(path, stamp):
+    imports, opening, printing = verify_code(path)
+    return tuple(imports), opening, printing
+
+
+# Turn logs are written in the background, so report a failed write here rather than letting the error go unseen
+def _report_log_error(future):
+    error = future.exception()
+    if error is not None:
+        print(f'Failed to write turn log: {error}', file=sys.stderr)
+        traceback.print_exception(error)
+
 
 class Engine:
+    __slots__ = ('clients', 'master_controller', 'tick_number', 'game_logs', 'world', 'current_world_key',
+                 'quiet_mode', '_functional', '_pool', '_log_writer', '_log_prefix', '_clients_arg', '_interpret',
+                 '_turn_logic', '_turn_log', '_final_results', '_client_args', '_done',
+                 '_workers', '_turn_funcs')
+
     def __init__(self, quiet_mode=False):
+        # Set up logging once here rather than on every debug call
+        if Debug.level >= DebugLevel.ENGINE:
+            logging.basicConfig(level=logging.DEBUG)
+
         self.clients = list()
+        # What gets handed to the master controller; a single client when only one is set to play
+        self._clients_arg = self.clients
+        # Clients still taking turns; only rebuilt when a client is dropped
+        self._functional = list()
         self.master_controller = MasterController()
         self.tick_number = 0
+        # Set once the game is over so the loop can stop; shutdown is then left to loop's finally block
+        self._done = False
+
+        # Master controller methods called every tick, bound once
+        self._interpret = self.master_controller.interpret_current_turn_data
+        self._client_args = self.master_controller.client_turn_arguments
+        self._turn_logic = self.master_controller.turn_logic
+        self._turn_log = self.master_controller.create_turn_log
+        self._final_results = self.master_controller.return_final_results
 
         self.game_logs = dict()
         self.world = None
@@ -30,6 +82,17 @@ class Engine:
 
         self.quiet_mode = quiet_mode
 
+        # Prefix for the per-turn log files, so paths don't need joining every tick
+        self._log_prefix = LOGS_DIR + os.sep
+
+        # Worker pool that runs client turns; created in boot once the clients are known
+        self._pool = None
+        # Client processes when CLIENT_CPU_BOUND is set, and the take_turn each client's turn is submitted with
+        self._workers = dict()
+        self._turn_funcs = dict()
+        # Single background thread that writes the per-turn log files in order
+        self._log_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='logwriter')
+
     # Starting point of the engine. Runs other methods then sits on top of a basic game loop until over
     def loop(self):
         try:
@@ -40,15 +103,15 @@ class Engine:
                 sys.stdout = f
             self.load()
             self.boot()
-            for self.current_world_key in tqdm(
-                    self.master_controller.game_loop_logic(),
-                    bar_format=TQDM_BAR_FORMAT,
-                    unit=TQDM_UNITS,
-                    file=f):
+            # The progress bar is never seen in quiet mode, so skip tqdm's per-turn formatting there
+            turns = self.master_controller.game_loop_logic()
+            if not self.quiet_mode:
+                turns = tqdm(turns, bar_format=TQDM_BAR_FORMAT, unit=TQDM_UNITS, file=f)
+            for self.current_world_key in turns:
                 self.pre_tick()
                 self.tick()
                 self.post_tick()
-                if self.tick_number >= MAX_TICKS:
+                if self._done or self.tick_number >= MAX_TICKS:
                     break
         except Exception as e:
             print(f"Exception raised during runtime: {str(e)}")
@@ -64,70 +127,100 @@ class Engine:
         sys.path.insert(0, f'{current_dir}/{CLIENT_DIRECTORY}')
 
         # Find and load clients in
-        for filename in os.listdir(CLIENT_DIRECTORY):
-            try:
-                filename = filename.replace('.py', '')
+        with os.scandir(CLIENT_DIRECTORY) as entries:
+            for entry in entries:
+                try:
+                    # Filter out folders and anything that isn't a python file
+                    if entry.is_dir() or not entry.name.endswith('.py'):
+                        continue
 
-                # Filter out files that do not contain CLIENT_KEYWORD in their filename (located in config)
-                if CLIENT_KEYWORD.upper() not in filename.upper():
-                    continue
+                    filename = entry.name[:-3]
 
-                # Filter out folders
-                if os.path.isdir(os.path.join(CLIENT_DIRECTORY, filename)):
-                    continue
+                    # Filter out files that do not contain CLIENT_KEYWORD in their filename (located in config)
+                    if _KEYWORD_CF not in filename.casefold():
+                        continue
 
-                # Otherwise, instantiate the player
-                player = Player()
-                self.clients.append(player)
+                    # Otherwise, instantiate the player
+                    player = Player()
+                    self.clients.append(player)
 
-                # Verify client isn't using invalid imports or opening anything
-                imports, opening, printing = verify_code(filename + '.py')
-                if len(imports) != 0:
-                    player.functional = False
-                    player.error = f'Player has attempted illegal imports: {imports}'
+                    # Verify client isn't using invalid imports or opening anything
+                    stat = os.stat(entry.path)
+                    imports, opening, printing = _verify_cached(
+                        os.path.abspath(entry.path), (stat.st_mtime_ns, stat.st_size, stat.st_dev, stat.st_ino))
+                    if len(imports) != 0:
+                        player.functional = False
+                        player.error = f'Player has attempted illegal imports: {list(imports)}'
 
-                if opening:
-                    player.functional = False
-                    player.error = 'Player is using "open" which is forbidden.'
+                    if opening:
+                        player.functional = False
+                        player.error = 'Player is using "open" which is forbidden.'
 
-                # Attempt creation of the client object
-                obj: UserClient | None = None
-                try:
-                    # Import client's code
-                    im = importlib.import_module(f'{filename}', CLIENT_DIRECTORY)
-                    obj = im.Client()
-                except Exception:
-                    player.functional = False
-                    player.error = str(traceback.format_exc())
-                    continue
+                    # Attempt creation of the client object
+                    obj: UserClient | None = None
+                    try:
+                        # Import client's code
+                        im = importlib.import_module(f'{filename}', CLIENT_DIRECTORY)
+                        obj = im.Client()
+                    except Exception:
+                        player.functional = False
+                        player.error = str(traceback.format_exc())
+                        continue
 
-                player.code = obj
-                thr = None
-                try:
-                    # Retrieve team name
-                    thr = CommunicationThread(player.code.team_name, list(), str)
-                    thr.start()
-                    thr.join(0.01)  # Shouldn't take long to get a string
+                    player.code = obj
 
-                    if thr.is_alive():
-                        player.functional = False
-                        player.error = 'Client failed to provide a team name in time.'
+                    # A team name set as a plain string can be read directly, no client code has to run for it
+                    team_name = inspect.getattr_static(obj, 'team_name', None)
+                    if isinstance(team_name, str):
+                        player.file_name = filename
+                        player.team_name = team_name
+                        continue
 
-                    if thr.error is not None:
-                        player.functional = False
-                        player.error = str(thr.error)
-                finally:
-                    # Note: I keep the above thread for both naming conventions to check for client errors
+                    thr = None
                     try:
-                        player.file_name = filename
-                        player.team_name = thr.retrieve_value()
-                    except Exception as e:
-                        player.functional = False
-                        player.error = f"{str(e)}\n{traceback.print_exc()}"
-            except Exception as e:
-                print(f"Bad client for {filename}: exception: {e}")
-                print(f"{traceback.print_exc()}")
-                player.functional = False
+                        # Retrieve team name
+                        thr = CommunicationThread(player.code.team_name, list(), str)
+                        thr.start()
+                        thr.join(0.01)  # Shouldn't take long to get a string
+
+                        if thr.is_alive():
+                            player.functional = False
+                            player.error = 'Client failed to provide a team name in time.'
+
+                        if thr.error is not None:
+                            player.functional = False
+                            player.error = str(thr.error)
+                    finally:
+                        # Note: I keep the above thread for both naming conventions to check for client errors
+                        try:
+                            player.file_name = filename
+                            player.team_name = thr.retrieve_value()
+                        except Exception as e:
+                            player.functional = False
+                            player.error = f"{str(e)}\n{traceback.print_exc()}"
+                except Exception as e:
+                    print(f"Bad client for {filename}: exception: {e}")
+                    print(f"{traceback.print_exc()}")
+                    player.functional = False
+
+        # CPU heavy clients each get their own process so they aren't all sharing one core. The processes are started
+        # and waited on here so their start up time isn't charged to the first turn
+        if CLIENT_CPU_BOUND:
+            for client in self.clients:
+                if not client.functional:
+                    continue
+                try:
+                    self._workers[client] = ClientProcess(client.code)
+                except Exception:
+                    client.functional = False
+                    client.error = str(traceback.format_exc())
+
+            for client, worker in list(self._workers.items()):
+                if not worker.wait_ready(MAX_SECONDS_CLIENT_STARTUP):
+                    worker.terminate()
+                    del self._workers[client]
+                    client.functional = False
+                    client.error = 'Client failed to start in time.'
 
         # Verify correct number of clients have connected to start
         func_clients = [client for client in self.clients if client.functional]
@@ -141,11 +234,17 @@ class Engine:
         else:
             # Sort clients based on name, for the client runner
             self.clients.sort(key=lambda clnt: clnt.team_name, reverse=True)
-            # Finally, request master controller to establish clients with basic objects
+            self._functional = [client for client in self.clients if client.functional]
+            # Create the worker pool once so client turns don't spawn a new thread every tick
+            self._pool = ThreadPoolExecutor(max_workers=max(1, len(func_clients)), thread_name_prefix='client')
+            self._turn_funcs = {client: client.code.take_turn for client in self._functional}
+            # With client processes, the pool's threads only wait on them
+            if CLIENT_CPU_BOUND:
+                self._turn_funcs = {client: worker.take_turn for client, worker in self._workers.items()}
             if SET_NUMBER_OF_CLIENTS_START == 1:
-                self.master_controller.give_clients_objects(self.clients[0], self.world)
-            else:
-                self.master_controller.give_clients_objects(self.clients, self.world)
+                self._clients_arg = self.clients[0]
+            # Finally, request master controller to establish clients with basic objects
+            self.master_controller.give_clients_objects(self._clients_arg, self.world)
 
     # Loads in the world
     def load(self):
@@ -158,15 +257,22 @@ class Engine:
             raise FileNotFoundError('Game map not found.')
 
         # Delete previous logs
-        for filename in os.listdir(LOGS_DIR):
-            if os.path.join(LOGS_DIR, filename) == GAME_MAP_FILE:
-                continue
-            os.remove(os.path.join(LOGS_DIR, filename))
+        game_map_file = os.path.abspath(GAME_MAP_FILE)
+        with os.scandir(LOGS_DIR) as entries:
+            for entry in entries:
+                if not entry.is_file() or os.path.abspath(entry.path) == game_map_file:
+                    continue
+                os.unlink(entry.path)
 
         world = None
-        with open(GAME_MAP_FILE) as json_file:
-            world = json.load(json_file)
-            world['game_board'] = GameBoard().from_json(world['game_board'])
+        # Use orjson to parse the map when it's available, it is much faster than the json module
+        if orjson is not None:
+            with open(GAME_MAP_FILE, 'rb') as json_file:
+                world = orjson.loads(json_file.read())
+        else:
+            with open(GAME_MAP_FILE) as json_file:
+                world = json.load(json_file)
+        world['game_board'] = GameBoard().from_json(world['game_board'])
         self.world = world
 
     # Sits on top of all actions that need to happen before the player takes their turn
@@ -175,68 +281,54 @@ class Engine:
         self.tick_number += 1
 
         # Send current world information to master controller for purposes
-        if SET_NUMBER_OF_CLIENTS_START == 1:
-            self.master_controller.interpret_current_turn_data(self.clients[0], self.world, self.tick_number)
-        else:
-            self.master_controller.interpret_current_turn_data(self.clients, self.world, self.tick_number)
+        self._interpret(self._clients_arg, self.world, self.tick_number)
 
     # Does actions like lets the player take their turn and asks master controller to perform game logic
     def tick(self):
-        # Create list of threads to run client's code
-        threads = list()
-        for client in self.clients:
-            # Skip non-functional clients
-            if not client.functional:
-                continue
-
+        # Submit each functional client's turn to the worker pool
+        futures = dict()
+        for client in self._functional:
             # Retrieve list of arguments to pass
-            arguments = self.master_controller.client_turn_arguments(client, self.tick_number)
-
-            # Create the thread, pass the arguments
-            thr = Thread(func=client.code.take_turn, args=arguments)
-            threads.append(thr)
-
-        # Start all threads
-        [thr.start() for thr in threads]
-
-        # Time and wait for clients to be done
-        start_time = datetime.now()
-        for thr in threads:
-            # We only want to wait a maximum of MAX_SECONDS_PER_TURN once all of the clients have started.
-            # However, we can't simultaneously join threads without more threads or multiprocessing.
-            # Solution: join one thread at a time, keep track of total running time between each join, and reduce the
-            # join time, so it is always less than MAX_SECONDS_PER_TURN.
-            # Get time elapsed in microseconds
-            time_elapsed = datetime.now().microsecond - start_time.microsecond
-            # Convert to seconds
-            time_elapsed /= 1000000
-            # Subtract value from MAX_SECONDS_PER_TURN to get time remaining
-            time_remaining = MAX_SECONDS_PER_TURN - time_elapsed
-            # Ensure value never goes negative
-            time_remaining = max(0.0, time_remaining)
-
-            thr.join(time_remaining)
-
-        # Go through each thread and check if they are still alive
-        for client, thr in zip(self.clients, threads):
-            # Load actions into player
-            client.actions = thr.result if thr.result is not None else []
-
-            # If thread is no longer alive, mark it as non-functional, preventing it from receiving future turns
-            if thr.is_alive():
+            arguments = self._client_args(client, self.tick_number)
+
+            futures[client] = self._pool.submit(self._turn_funcs[client], *arguments)
+
+        # Wait a maximum of MAX_SECONDS_PER_TURN in total for all clients to be done
+        _, not_done = wait(futures.values(), timeout=MAX_SECONDS_PER_TURN)
+
+        newly_failed = list()
+        for client, fut in futures.items():
+            # If the client is still running, mark it as non-functional, preventing it from receiving future turns
+            if fut in not_done:
+                fut.cancel()
+                # A client in its own process can be stopped, so it doesn't keep running for the rest of the game
+                if client in self._workers:
+                    self._workers[client].terminate()
+                client.actions = []
                 client.functional = False
+                newly_failed.append(client)
                 client.error = f'{client.id} failed to reply in time and has been dropped.'
                 print(client.error)
+                continue
 
-            # Also check to see if the client had created an error and save it
-            if thr.error is not None:
+            try:
+                # Load actions into player
+                result = fut.result()
+                client.actions = result if result is not None else []
+            except Exception:
+                # Also check to see if the client had created an error and save it
+                client.actions = []
                 client.functional = False
-                client.error = thr.error
-                print(thr.error)
+                newly_failed.append(client)
+                client.error = traceback.format_exc()
+                print(client.error)
+
+        # Only rebuild the functional list when a client was dropped this turn
+        if newly_failed:
+            self._functional = [client for client in self._functional if client.functional]
 
         # Verify there are enough clients to continue the game
-        func_clients = [client for client in self.clients if client.functional]
-        client_num_correct = verify_num_clients(func_clients,
+        client_num_correct = verify_num_clients(self._functional,
                                                 SET_NUMBER_OF_CLIENTS_CONTINUE,
                                                 MIN_CLIENTS_CONTINUE,
                                                 MAX_CLIENTS_CONTINUE)
@@ -244,38 +336,38 @@ class Engine:
             self.shutdown(source='Client_error')
 
         # Finally, consult master controller for game logic
-        if SET_NUMBER_OF_CLIENTS_START == 1:
-            self.master_controller.turn_logic(self.clients[0], self.tick_number)
-        else:
-            self.master_controller.turn_logic(self.clients, self.tick_number)
+        self._turn_logic(self._clients_arg, self.tick_number)
 
     # Does any actions that need to happen after the game logic, then creates the game log for the turn
     def post_tick(self):
         # Add logs to logs list
-        data = None
-        if SET_NUMBER_OF_CLIENTS_START == 1:
-            data = self.master_controller.create_turn_log(self.clients[0], self.tick_number)
-        else:
-            data = self.master_controller.create_turn_log(self.clients, self.tick_number)
+        data = self._turn_log(self._clients_arg, self.tick_number)
 
-        threading.Thread(target=write_json_file,
-                         args=(data, os.path.join(LOGS_DIR, f'turn_{self.tick_number:04d}.json'))).start()
+        future = self._log_writer.submit(write_json_file, data, f'{self._log_prefix}turn_{self.tick_number:04d}.json')
+        future.add_done_callback(_report_log_error)
 
         # Perform a game over check
         if self.master_controller.game_over:
-            self.shutdown()
+            self._done = True
 
     # Attempts to safely handle an engine shutdown given any game state
     def shutdown(self, source=None):
+        # End any client processes first; this also frees pool threads still waiting on them
+        for worker in self._workers.values():
+            worker.terminate()
+
+        # Stop accepting client turns and drop any that haven't started; don't wait on clients that may still be hanging
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+        # Make sure every turn log has been written before the final files
+        self._log_writer.shutdown(wait=True)
+
         # Write log files
         write_json_file(self.game_logs, LOGS_FILE)
 
         # Retrieve and write results information
-        results_information = None
-        if SET_NUMBER_OF_CLIENTS_START == 1:
-            results_information = self.master_controller.return_final_results(self.clients[0], self.tick_number)
-        else:
-            results_information = self.master_controller.return_final_results(self.clients, self.tick_number)
+        results_information = self._final_results(self._clients_arg, self.tick_number)
 
         if source:
             results_information['reason'] = source
@@ -293,6 +385,8 @@ class Engine:
             # Flush standard out
             sys.stdout.flush()
 
+            # All log and results files are written by this point. os._exit is kept over sys.exit since a client
+            # thread that is still hanging would stop the interpreter from ever exiting
             os._exit(1)
         else:
             print(f'\nGame has successfully ended.')
@@ -303,8 +397,7 @@ class Engine:
             # os._exit(0)
 
     # Debug print statement
-    def debug(*args):
+    def debug(self, *args):
         if Debug.level >= DebugLevel.ENGINE:
-            logging.basicConfig(level=logging.DEBUG)
             for arg in args:
-                logging.debug(f'Engine: {arg}')
+                _logger.debug('Engine: %s', arg)
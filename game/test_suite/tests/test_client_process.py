@@ -0,0 +1,111 @@
+import multiprocessing
+import time
+import unittest
+
+from game.config import MAX_SECONDS_CLIENT_STARTUP, MAX_SECONDS_PER_TURN
+from game.utils.process import ClientProcess
+
+
+class CountingClient:
+    def __init__(self):
+        self.count = 0
+
+    def take_turn(self, turn):
+        self.count += 1
+        return [turn, self.count]
+
+
+class RaisingClient:
+    def take_turn(self, turn):
+        raise ValueError('bad turn')
+
+
+class HangingClient:
+    def take_turn(self, turn):
+        while True:
+            pass
+
+
+def _fail_to_load():
+    raise ValueError('client could not be loaded')
+
+
+def _load_slowly():
+    time.sleep(MAX_SECONDS_CLIENT_STARTUP)
+    return CountingClient()
+
+
+class BrokenClient:
+    # Unpickling this in the worker raises, so the worker dies before it is ready
+    def __reduce__(self):
+        return _fail_to_load, ()
+
+
+class SlowClient:
+    # Unpickling this in the worker takes as long as the whole start up budget
+    def __reduce__(self):
+        return _load_slowly, ()
+
+
+class TestClientProcess(unittest.TestCase):
+    """
+    `Test Client Process Notes:`
+
+        This class tests the ClientProcess class that runs clients in their own process when CLIENT_CPU_BOUND is set.
+    """
+
+    def test_state_kept_between_turns(self):
+        worker = ClientProcess(CountingClient())
+        self.assertTrue(worker.wait_ready(MAX_SECONDS_CLIENT_STARTUP))
+        try:
+            self.assertEqual(worker.take_turn(1), [1, 1])
+            self.assertEqual(worker.take_turn(2), [2, 2])
+            self.assertEqual(worker.take_turn(3), [3, 3])
+        finally:
+            worker.terminate()
+
+    def test_client_error_raised(self):
+        worker = ClientProcess(RaisingClient())
+        self.assertTrue(worker.wait_ready(MAX_SECONDS_CLIENT_STARTUP))
+        try:
+            with self.assertRaises(RuntimeError) as e:
+                worker.take_turn(1)
+            self.assertIn('ValueError: bad turn', str(e.exception))
+        finally:
+            worker.terminate()
+
+    def test_terminate_hanging_client(self):
+        worker = ClientProcess(HangingClient())
+        self.assertTrue(worker.wait_ready(MAX_SECONDS_CLIENT_STARTUP))
+        worker.conn.send((1,))
+        worker.terminate()
+        self.assertFalse(worker.process.is_alive())
+        # Anything still waiting on the client is released once its process is gone
+        with self.assertRaises((EOFError, ConnectionResetError)):
+            worker.conn.recv()
+
+    def test_spawn_ready_before_first_turn(self):
+        # spawn (the default on Windows and macOS) starts a new interpreter for the worker, so it is the slowest to start
+        worker = ClientProcess(CountingClient(), multiprocessing.get_context('spawn'))
+        try:
+            self.assertTrue(worker.wait_ready(MAX_SECONDS_CLIENT_STARTUP))
+            start = time.monotonic()
+            self.assertEqual(worker.take_turn(1), [1, 1])
+            self.assertLess(time.monotonic() - start, MAX_SECONDS_PER_TURN)
+            self.assertEqual(worker.take_turn(2), [2, 2])
+        finally:
+            worker.terminate()
+
+    def test_spawn_client_fails_to_start(self):
+        worker = ClientProcess(BrokenClient(), multiprocessing.get_context('spawn'))
+        try:
+            self.assertFalse(worker.wait_ready(MAX_SECONDS_CLIENT_STARTUP))
+        finally:
+            worker.terminate()
+
+    def test_spawn_client_not_ready_in_time(self):
+        worker = ClientProcess(SlowClient(), multiprocessing.get_context('spawn'))
+        try:
+            self.assertFalse(worker.wait_ready(MAX_SECONDS_PER_TURN))
+        finally:
+            worker.terminate()
@@ -0,0 +1,240 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from game.common.enums import *
+from game.common.player import Player
+from game.config import MAX_SECONDS_PER_TURN
+from game.engine import Engine
+from game.utils.thread import CommunicationThread
+
+
+class StubClient:
+    def __init__(self, result=None, error=None, release=None):
+        self.result = result
+        self.error = error
+        self.release = release
+        self.turns = 0
+
+    def take_turn(self, turn):
+        self.turns += 1
+        if self.release is not None:
+            self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class TestEngine(unittest.TestCase):
+    """
+    `Test Engine Notes:`
+
+        This class tests how the Engine runs client turns and ends the game. The master controller calls are replaced
+        so that stub clients can be used without a game map. Engine.shutdown is patched out, since it would otherwise
+        exit the process when a client is dropped.
+    """
+
+    def setUp(self) -> None:
+        self.shutdown = patch.object(Engine, 'shutdown').start()
+        # Keep the engine's reports on dropped clients out of the test output
+        patch('game.engine.print', create=True).start()
+        self.addCleanup(patch.stopall)
+
+        self.engine: Engine = Engine()
+        self.engine._client_args = lambda client, turn: (turn,)
+        self.engine._turn_logic = lambda clients, turn: None
+        self.release: threading.Event = threading.Event()
+
+    def tearDown(self) -> None:
+        # Let any client still waiting finish so no worker threads are left behind
+        self.release.set()
+        if self.engine._pool is not None:
+            self.engine._pool.shutdown(wait=True)
+        self.engine._log_writer.shutdown(wait=True)
+
+    def add_clients(self, *codes) -> list[Player]:
+        players = [Player(code=code, actions=[]) for code in codes]
+        self.engine.clients.extend(players)
+        self.engine._functional = list(players)
+        self.engine._turn_funcs = {player: player.code.take_turn for player in players}
+        self.engine._pool = ThreadPoolExecutor(max_workers=len(players))
+        return players
+
+    def test_tick_results(self):
+        first, second = self.add_clients(StubClient(result=[ActionType.MOVE_UP]),
+                                         StubClient(result=[ActionType.MOVE_DOWN]))
+        self.engine.tick()
+        self.assertEqual(first.actions, [ActionType.MOVE_UP])
+        self.assertEqual(second.actions, [ActionType.MOVE_DOWN])
+        self.assertTrue(first.functional)
+        self.assertTrue(second.functional)
+        self.shutdown.assert_not_called()
+
+    def test_tick_hanging_clients_dropped_within_budget(self):
+        # Both clients hang, so they have to share one MAX_SECONDS_PER_TURN instead of waiting for each in turn
+        first, second = self.add_clients(StubClient(release=self.release), StubClient(release=self.release))
+        start = time.monotonic()
+        self.engine.tick()
+        elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, MAX_SECONDS_PER_TURN * 2)
+        for player in (first, second):
+            self.assertFalse(player.functional)
+            self.assertEqual(player.actions, [])
+            self.assertEqual(player.error, f'{player.id} failed to reply in time and has been dropped.')
+        self.assertEqual(self.engine._functional, [])
+        self.shutdown.assert_called_once_with(source='Client_error')
+
+    def test_tick_raising_client(self):
+        first, second = self.add_clients(StubClient(result=[ActionType.MOVE_UP]),
+                                         StubClient(error=ValueError('bad turn')))
+        self.engine.tick()
+        self.assertTrue(first.functional)
+        self.assertFalse(second.functional)
+        self.assertEqual(second.actions, [])
+        self.assertIn('Traceback', second.error)
+        self.assertIn('ValueError: bad turn', second.error)
+        self.assertEqual(self.engine._functional, [first])
+
+    def test_tick_results_after_non_functional_client(self):
+        dropped, first, second = self.add_clients(StubClient(result=[ActionType.INTERACT_CENTER]),
+                                                  StubClient(result=[ActionType.MOVE_UP]),
+                                                  StubClient(result=[ActionType.MOVE_DOWN]))
+        dropped.functional = False
+        self.engine._functional = [first, second]
+        self.engine.tick()
+
+        self.assertEqual(dropped.code.turns, 0)
+        self.assertEqual(dropped.actions, [])
+        self.assertEqual(first.actions, [ActionType.MOVE_UP])
+        self.assertEqual(second.actions, [ActionType.MOVE_DOWN])
+
+    def test_game_over_shuts_down_once(self):
+        self.engine._interpret = lambda clients, world, turn: None
+        self.engine._turn_log = lambda clients, turn: {'tick': turn}
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        self.engine._log_prefix = log_dir.name + '/'
+
+        def tick(engine):
+            if engine.tick_number == 3:
+                engine.master_controller.game_over = True
+
+        stdout = sys.stdout
+        try:
+            with patch.object(Engine, 'load'), patch.object(Engine, 'boot'), patch.object(Engine, 'tick', tick):
+                self.engine.quiet_mode = True
+                self.engine.loop()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+        self.assertEqual(self.engine.tick_number, 3)
+        self.shutdown.assert_called_once_with()
+
+
+class TestEngineBoot(unittest.TestCase):
+    """
+    `Test Engine Boot Notes:`
+
+        This class tests how Engine.boot gets each client's team name. Client files are written to a temporary
+        directory that is used as the working directory while boot looks for clients.
+    """
+
+    def setUp(self) -> None:
+        self.shutdown = patch.object(Engine, 'shutdown').start()
+        self.addCleanup(patch.stopall)
+
+        self.client_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.client_dir.cleanup)
+        self.cwd = os.getcwd()
+        self.sys_path = list(sys.path)
+        os.chdir(self.client_dir.name)
+
+        self.engine: Engine = Engine()
+        self.engine.master_controller.give_clients_objects = lambda clients, world: None
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        sys.path[:] = self.sys_path
+        for name in ('engine_string_client', 'engine_method_client'):
+            sys.modules.pop(name, None)
+        if self.engine._pool is not None:
+            self.engine._pool.shutdown(wait=True)
+        self.engine._log_writer.shutdown(wait=True)
+
+    def write_client(self, name: str, team_name_source: str, directory: str | None = None,
+                     imports: str = 'import math') -> None:
+        with open(os.path.join(directory or self.client_dir.name, f'{name}.py'), 'w') as f:
+            f.write(f'{imports}\n'
+                    'from game.client.user_client import UserClient\n'
+                    '\n'
+                    '\n'
+                    'class Client(UserClient):\n'
+                    f'{team_name_source}\n'
+                    '\n'
+                    '    def take_turn(self, turn, actions, world, avatar):\n'
+                    '        return []\n')
+
+    def boot(self) -> dict[str, Player]:
+        self.write_client('engine_string_client', "    team_name = 'String Team'")
+        self.write_client('engine_method_client', "    def team_name(self):\n        return 'Method Team'")
+        self.engine.boot()
+        self.shutdown.assert_not_called()
+        return {player.file_name: player for player in self.engine.clients}
+
+    def test_boot_string_team_name(self):
+        # A plain string is read directly instead of being called in a CommunicationThread
+        player = self.boot()['engine_string_client']
+        self.assertEqual(player.team_name, 'String Team')
+        self.assertTrue(player.functional)
+        self.assertIsNone(player.error)
+
+    def test_boot_method_team_name(self):
+        with patch('game.engine.CommunicationThread', wraps=CommunicationThread) as thread:
+            player = self.boot()['engine_method_client']
+        thread.assert_called_once()
+        self.assertEqual(player.team_name, 'Method Team')
+        self.assertTrue(player.functional)
+        self.assertIsNone(player.error)
+
+    def test_boot_client_process_not_ready(self):
+        with patch('game.engine.CLIENT_CPU_BOUND', True), patch('game.engine.ClientProcess') as client_process:
+            client_process.return_value.wait_ready.return_value = False
+            self.write_client('engine_string_client', "    team_name = 'String Team'")
+            self.write_client('engine_method_client', "    def team_name(self):\n        return 'Method Team'")
+            self.engine.boot()
+
+        self.assertEqual(client_process.return_value.terminate.call_count, 2)
+        self.assertEqual(self.engine._workers, {})
+        for player in self.engine.clients:
+            self.assertFalse(player.functional)
+            self.assertEqual(player.error, 'Client failed to start in time.')
+        self.shutdown.assert_called_with(source='Client_error')
+
+    def test_boot_verifies_same_file_name_in_other_directory(self):
+        # The second directory has files with the same names, sizes and modification times, only with an illegal import
+        self.boot()
+        other_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(other_dir.cleanup)
+        for name, team_name_source in (('engine_string_client', "    team_name = 'String Team'"),
+                                       ('engine_method_client', "    def team_name(self):\n        return 'Method Team'")):
+            self.write_client(name, team_name_source, other_dir.name, 'import time')
+            stat = os.stat(os.path.join(self.client_dir.name, f'{name}.py'))
+            os.utime(os.path.join(other_dir.name, f'{name}.py'), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        os.chdir(other_dir.name)
+        engine = Engine()
+        self.addCleanup(engine._log_writer.shutdown, wait=True)
+        engine.master_controller.give_clients_objects = lambda clients, world: None
+        engine.boot()
+
+        self.assertEqual(len(engine.clients), 2)
+        for player in engine.clients:
+            self.assertFalse(player.functional)
+            self.assertEqual(player.error, "Player has attempted illegal imports: ['time']")
@@ -1,10 +1,24 @@
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def write_json_file(data, filename):
     """
     This file contain the method ``write_json_file``. It opens the a file with the given name and writes all the given data
-    to the file.
+    to the file. orjson is used to serialize the data when it is installed, since it is much faster than the json module.
+
+    **NOTE:** The two paths indent differently. orjson can only indent with 2 spaces, while the json fallback indents
+    with tabs, so the same game writes differently formatted files (including the game map) depending on whether
+    orjson is installed. Both are valid JSON and load the same way.
     """
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+        return
+
     with open(filename, 'w') as f:
         json.dump(data, f, indent='\t')
@@ -0,0 +1,71 @@
+import multiprocessing
+import traceback
+
+# Sent by the worker once it is running, so start up time isn't counted against the first turn
+_READY = 'ready'
+
+
+def _serve(code, conn):
+    # Runs inside the worker process. The client object lives here for the whole game, so anything it saves between
+    # turns is kept
+    conn.send(_READY)
+    while True:
+        try:
+            args = conn.recv()
+        except EOFError:
+            return
+
+        try:
+            reply = (code.take_turn(*args), None)
+        except Exception:
+            reply = (None, traceback.format_exc())
+
+        try:
+            conn.send(reply)
+        except Exception:
+            conn.send((None, traceback.format_exc()))
+
+
+class ClientProcess:
+    """
+    `Client Process Class Notes:`
+        Client Processes are used instead of Threads when clients are CPU bound (see ``CLIENT_CPU_BOUND`` in the
+        config). Each client gets one long-lived process that holds its client object, so variables saved on the client
+        between turns behave the same as they do with Threads.
+
+        Starting a process can take a while, especially with the ``spawn`` start method used on Windows and macOS,
+        where the interpreter has to start and re-import everything. ``wait_ready`` waits for the process to report
+        that it is running, and must be called before the first ``take_turn``.
+
+        ``take_turn`` sends the turn's arguments to the process and blocks until the client's result comes back. If the
+        client raised an error, it is raised again here with the client's traceback as the message.
+
+        Unlike a Thread, a Client Process can be stopped with ``terminate``. This is what allows the engine to end a
+        client that hangs instead of leaving it running after the game is over.
+    """
+    def __init__(self, code, context=None):
+        context = context or multiprocessing.get_context()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_serve, args=(code, child_conn), daemon=True)
+        self.process.start()
+        # Only the worker should hold its end of the pipe, so the worker exiting is seen here as an EOFError
+        child_conn.close()
+
+    def wait_ready(self, timeout):
+        # A process that dies before it is ready shows up here as an EOFError
+        try:
+            return self.conn.poll(timeout) and self.conn.recv() == _READY
+        except (EOFError, OSError):
+            return False
+
+    def take_turn(self, *args):
+        self.conn.send(args)
+        result, error = self.conn.recv()
+        if error is not None:
+            raise RuntimeError(error)
+        return result
+
+    def terminate(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()